@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import List, Tuple, Union
 import pulp
 import math
 import numpy as np
@@ -97,7 +97,9 @@ def build_positions_model(
     return prob, positions, l_bound
 
 
-def build_pulp_model(W: int, N: int, widths, heights) -> pulp.LpProblem:
+def build_pulp_model(
+    W: int, N: int, widths, heights
+) -> Tuple[pulp.LpProblem, List[pulp.LpVariable], List[pulp.LpVariable], None]:
     set_N = range(N)
     prob = pulp.LpProblem("vlsi", pulp.LpMinimize)
     # Lower and upper bounds for the height
@@ -168,10 +170,12 @@ def build_pulp_model(W: int, N: int, widths, heights) -> pulp.LpProblem:
                     <= 3
                 )
 
-    return prob
+    return prob, coord_x, coord_y, None
 
 
-def build_pulp_rotation_model(W: int, N: int, widths, heights) -> pulp.LpProblem:
+def build_pulp_rotation_model(
+    W: int, N: int, widths, heights
+) -> Tuple[pulp.LpProblem, List[pulp.LpVariable], List[pulp.LpVariable], dict]:
     prob = pulp.LpProblem("vlsi-with-rotation", pulp.LpMinimize)
 
     # Lower and upper bounds for the height
@@ -283,4 +287,4 @@ def build_pulp_rotation_model(W: int, N: int, widths, heights) -> pulp.LpProblem
     prob += coord_x[max_circuit] == 0, "Max circuit in x-0"
     prob += coord_y[max_circuit] == 0, "Max circuit in y-0"
 
-    return prob
+    return prob, coord_x, coord_y, rotation
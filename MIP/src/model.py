@@ -3,9 +3,14 @@ sys.path.append("./")
 
 import logging
 import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
 from typing import List, Tuple, Union
+import numpy as np
 
-from utils.manage_paths import format_data_file, format_plot_file, format_statistic_file
+from utils.manage_paths import format_plot_file, format_statistic_file
 from utils.manage_statistics import checking_instances, save_statistics
 from utils.mip_utils import (
     build_mip_solution,
@@ -14,6 +19,7 @@ from utils.mip_utils import (
     configure_cplex_solver,
     configure_mosek_solver,
     parse_mip_argument,
+    set_mip_start,
 )
 from utils.solution_log import print_logging, save_solution
 from utils.smt_utils import extract_input_from_txt
@@ -21,7 +27,6 @@ from utils.plot import plot_solution
 from utils.minizinc_solver import run_minizinc
 from utils.types import (
     SOLUTION_ADMISSABLE,
-    InputMode,
     ModelType,
     Solution,
     SolverMinizinc,
@@ -35,34 +40,48 @@ from create_model import build_pulp_model, build_pulp_rotation_model
 run_type: RunType = RunType.MIP
 
 
+# The instances are read once, also when they are solved more than once in the same run
+@lru_cache(maxsize=64)
+def read_instance(input_name: str):
+    W, N, widths, heights = extract_input_from_txt(f"{input_name}.txt")
+    return W, N, tuple(widths), tuple(heights)
+
+
 def run_mip_solver(
     input_name: str,
     model_type: ModelType,
     solver: SolverMIP,
     timeout: int,
     configuration=None,
+    prev_sol: Solution = None,
+    solver_verbose: bool = False,
 ):
     sol = Solution()
-    data_file = format_data_file(input_name, InputMode.TXT)
-    W, N, widths, heights = extract_input_from_txt(data_file.rsplit("/", maxsplit=1)[1])
+    W, N, widths, heights = read_instance(input_name)
 
     sol.input_name = input_name
     sol.width = W
     sol.n_circuits = N
-    sol.circuits = [[widths[i], heights[i]] for i in range(N)]
+    sol.widths = np.asarray(widths, dtype=np.int32)
+    sol.heights = np.asarray(heights, dtype=np.int32)
 
     # Model selection
     if model_type == ModelType.BASE:
-        prob = build_pulp_model(W, N, widths, heights)
+        prob, coord_x, coord_y, rotation = build_pulp_model(W, N, widths, heights)
     elif model_type == ModelType.ROTATION:
-        prob = build_pulp_rotation_model(W, N, widths, heights)
+        prob, coord_x, coord_y, rotation = build_pulp_rotation_model(W, N, widths, heights)
     else:
         raise BaseException("Model type not available")
 
+    # Warm start from the solution of another instance
+    warm_start = prev_sol is not None and SOLUTION_ADMISSABLE(prev_sol.status)
+    if warm_start:
+        set_mip_start(prev_sol, coord_x, coord_y, rotation)
+
     if solver == SolverMIP.CPLEX:
-        solver = configure_cplex_solver(timeout, configuration)
+        solver = configure_cplex_solver(timeout, configuration, warm_start, solver_verbose)
     elif solver == SolverMIP.MOSEK:
-        solver = configure_mosek_solver(timeout)
+        solver = configure_mosek_solver(timeout, solver_verbose)
     else:
         raise BaseException("Solver not available")
 
@@ -79,7 +98,7 @@ def run_mip_solver(
     if SOLUTION_ADMISSABLE(sol.status):
         if prob.solutionTime > timeout:
             sol.status = StatusEnum.FEASIBLE
-        sol = build_mip_solution(prob, sol, N, model_type)
+        sol = build_mip_solution(prob, sol, coord_x, coord_y, rotation)
         """ sol.height = round(l)
 
         rotation = [False] * N
@@ -103,6 +122,8 @@ def compute_solution(
     timeout: int,
     verbose: bool,
     configuration=None,
+    prev_sol: Solution = None,
+    solver_verbose: bool = False,
 ):
     # plot path
     plot_file = format_plot_file(run_type, input_name, model_type)
@@ -113,8 +134,7 @@ def compute_solution(
         mz_solver = SolverMinizinc.CPLEX
         free_search = False
 
-        data_file = format_data_file(input_name, InputMode.TXT)
-        W, N, widths, heights = extract_input_from_txt(data_file.rsplit("/", maxsplit=1)[1])
+        W, N, widths, heights = read_instance(input_name)
 
         res_timeout = timeout
         height_opt = max(
@@ -140,7 +160,9 @@ def compute_solution(
                 
 
     elif solver == SolverMIP.MOSEK or solver == SolverMIP.CPLEX:
-        sol = run_mip_solver(input_name, model_type, solver, timeout, configuration)
+        sol = run_mip_solver(
+            input_name, model_type, solver, timeout, configuration, prev_sol, solver_verbose
+        )
 
     print_logging(sol, verbose)
     plot_solution(sol, plot_file)
@@ -155,46 +177,76 @@ def compute_tests(
     timeout: int,
     verbose: bool,
     configuration=None,
+    warm_start: bool = False,
+    solver_verbose: bool = False,
+    jobs: int = 1,
 ):
     test_iterator = checking_instances(test_instances)
     statistics_path = format_statistic_file(
         run_type, test_instances, model_type, solver=solver.value
     )
 
-    for i in range(len(test_iterator)):
-        input_name = f"ins-{test_iterator[i]}"
-        sol = compute_solution(
-            input_name,
-            model_type,
-            solver,
-            timeout,
-            verbose,
-            configuration[i] if configuration else None,
-        )
-        save_statistics(
-            statistics_path, sol, configuration[i] if configuration else None
-        )
-        print(
-            f"- Computed instance {test_iterator[i]}: {sol.status.name}{f' in time {sol.solve_time}' if SOLUTION_ADMISSABLE(sol.status) else ''}"
-        )
-        if SOLUTION_ADMISSABLE(sol.status):
-            widths = [i[0] for i in sol.circuits]
-            heights = [i[0] for i in sol.circuits]
-
-            save_solution(
-                run_type.value,
-                model_type.value,
-                input_name + ".txt",
-                (
-                    sol.width,
-                    sol.n_circuits,
-                    sol.height,
-                    widths,
-                    heights,
-                    sol.coords["x"],
-                    sol.coords["y"],
-                ),
+    # The instances are independent, unless each one is warm started from the previous
+    # The pool is shut down even if an instance fails, nothing is pooled for a sequential run
+    if jobs != 1 and not warm_start:
+        executor = ProcessPoolExecutor(max_workers=jobs if jobs > 0 else os.cpu_count())
+    else:
+        executor = nullcontext()
+    with executor as pool:
+        if pool is not None:
+            futures = [
+                pool.submit(
+                    compute_solution,
+                    f"ins-{test_iterator[i]}",
+                    model_type,
+                    solver,
+                    timeout,
+                    verbose,
+                    configuration[i] if configuration else None,
+                    None,
+                    solver_verbose,
+                )
+                for i in range(len(test_iterator))
+            ]
+
+        sol = None
+        # Statistics and solutions are always saved from the main process
+        for i in range(len(test_iterator)):
+            input_name = f"ins-{test_iterator[i]}"
+            if pool is not None:
+                sol = futures[i].result()
+            else:
+                sol = compute_solution(
+                    input_name,
+                    model_type,
+                    solver,
+                    timeout,
+                    verbose,
+                    configuration[i] if configuration else None,
+                    sol if warm_start else None,
+                    solver_verbose,
+                )
+            save_statistics(
+                statistics_path, sol, configuration[i] if configuration else None
             )
+            print(
+                f"- Computed instance {test_iterator[i]}: {sol.status.name}{f' in time {sol.solve_time}' if SOLUTION_ADMISSABLE(sol.status) else ''}"
+            )
+            if SOLUTION_ADMISSABLE(sol.status):
+                save_solution(
+                    run_type.value,
+                    model_type.value,
+                    input_name + ".txt",
+                    (
+                        sol.width,
+                        sol.n_circuits,
+                        sol.height,
+                        sol.widths,
+                        sol.heights,
+                        sol.coords["x"],
+                        sol.coords["y"],
+                    ),
+                )
 
 
 if __name__ == "__main__":
@@ -205,6 +257,9 @@ if __name__ == "__main__":
     timeout: int = parser_args["timeout"]
     verbose: bool = parser_args["verbose"]
     test_mode = parser_args["testing"]
+    warm_start: bool = parser_args["warmstart"]
+    solver_verbose: bool = parser_args["solver_verbose"]
+    jobs: int = parser_args["jobs"]
 
     # Check if the solver is installed in the user's system
     if not check_mip_solver_exists(solver):
@@ -216,6 +271,14 @@ if __name__ == "__main__":
         logging.error("Timeout out of range")
         sys.exit(2)
 
+    if jobs < 0:
+        logging.error("The number of jobs can't be negative")
+        sys.exit(2)
+
+    if warm_start and jobs != 1:
+        logging.error("Warm start needs the instances to be solved sequentially")
+        sys.exit(2)
+
     if test_mode is not None:
         
         configuration = None
@@ -227,6 +290,11 @@ if __name__ == "__main__":
             timeout,
             verbose,
             configuration=configuration,
+            warm_start=warm_start,
+            solver_verbose=solver_verbose,
+            jobs=jobs,
         )
     else:
-        compute_solution(input_name, model_type, solver, timeout, verbose)
+        compute_solution(
+            input_name, model_type, solver, timeout, verbose, solver_verbose=solver_verbose
+        )
@@ -17,6 +17,7 @@ if __name__ == "__main__":
     verbose = params['verbose']
     test_range = params['test']
     search_method = params['search']
+    dump_model = params['dump_model']
     logic = "LIA"
 
     model_type = ModelType.ROTATION if rotation else ModelType.BASE
@@ -27,7 +28,7 @@ if __name__ == "__main__":
 
         for i in range(test_range[0], test_range[1] + 1):
             inst_file = f'ins-{i}.txt'
-            inst_sol, inst_time = run_model(solver_name, inst_file, timeout, rotation, verbose, logic, search_method, stat_file)
+            inst_sol, inst_time = run_model(solver_name, inst_file, timeout, rotation, verbose, logic, search_method, stat_file, dump_model)
 
             if inst_sol is not None:
                 solutions.append({'instance':i, 'l': inst_sol['l'], 'time': inst_time})
@@ -38,7 +39,7 @@ if __name__ == "__main__":
     else:
         inst_num = int(instance_file[4:-4])
         stat_file = format_statistic_file(run_type, (inst_num, inst_num), model_type, StatisticMode.CSV, solver_name)
-        solution, ex_time = run_model(solver_name, instance_file, timeout, rotation, verbose, logic, search_method, stat_file)
+        solution, ex_time = run_model(solver_name, instance_file, timeout, rotation, verbose, logic, search_method, stat_file, dump_model)
         
         if solution is not None:
             print(f"Minimum found l is {solution['l']}, found in {round(ex_time, 4)} seconds.")
@@ -1,4 +1,5 @@
 from typing import Tuple
+import numpy as np
 from minizinc import Instance, Model, Solver, Result, Status, MiniZincError
 from utils.manage_paths import format_data_file, format_model_file
 from utils.solution_log import Solution
@@ -38,7 +39,9 @@ def get_minizinc_solution(
     # solutions
     sol.height = result.objective
     # inputs
-    sol.circuits = instance.__getitem__("CIRCUITS")
+    circuits = np.asarray(instance.__getitem__("CIRCUITS"), dtype=np.int32)
+    sol.widths = np.ascontiguousarray(circuits[:, 0])
+    sol.heights = np.ascontiguousarray(circuits[:, 1])
     sol.n_circuits = instance.__getitem__("N")
     sol.width = instance.__getitem__("W")
 
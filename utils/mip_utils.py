@@ -6,21 +6,24 @@ import mosek
 
 from utils.types import DEFAULT_TIMEOUT, ModelType, Solution, SolverMIP
 
-def build_mip_solution(prob: pulp.LpProblem, sol: Solution, N: int, model_type: ModelType):
+def build_mip_solution(
+    prob: pulp.LpProblem,
+    sol: Solution,
+    coord_x: List[pulp.LpVariable],
+    coord_y: List[pulp.LpVariable],
+    rotation=None,
+):
     sol.height = round(pulp.value(prob.objective))
-    rotation = [False] * N
-    coords = {"x": [None] * N, "y": [None] * N}
-    for v in prob.variables():
-        # print(f"{v.name}: {v.value()}")
-        if str(v.name).startswith("coord_x"):
-            coords["x"][int(v.name[8:])] = round(v.varValue)
-        elif str(v.name).startswith("coord_y"):
-            coords["y"][int(v.name[8:])] = round(v.varValue)
-        elif str(v.name).startswith("rot"):
-            rotation[int(v.name[4:])] = bool(round(v.varValue))
-
-    sol.coords = coords
-    sol.rotation = rotation if model_type == ModelType.ROTATION else None
+    sol.coords = {
+        "x": [round(v.varValue) for v in coord_x],
+        "y": [round(v.varValue) for v in coord_y],
+    }
+    # Rotations fixed while building the model are constants instead of variables
+    sol.rotation = (
+        [bool(round(pulp.value(rotation[i]))) for i in range(len(coord_x))]
+        if rotation is not None
+        else None
+    )
     return sol
 
 def parse_mip_argument():
@@ -35,6 +38,9 @@ def parse_mip_argument():
     )
     parser.add_argument("-t", "--timeout", default=DEFAULT_TIMEOUT, type=int)
     parser.add_argument("-v", "--verbose", action="store_true", default=False)
+    parser.add_argument("-sv", "--solver-verbose", action="store_true", default=False, help="Show the log of the MIP solver.")
+    parser.add_argument("-ws", "--warmstart", action="store_true", default=False, help="Use the solution of the previous instance as MIP start (only CPLEX).")
+    parser.add_argument("-j", "--jobs", default=1, type=int, help="Number of instances solved in parallel during the tests, 0 to use all the cores.")
     mode.add_argument("-test", "--testing", type=int, nargs=2, help="Specify the interval of instances to run the solver on.")
 
     args = parser.parse_args()
@@ -57,9 +63,27 @@ def check_mip_admissable_timeout(timeout: int):
     return timeout >= 0 and timeout <= (DEFAULT_TIMEOUT * 3 + 1)
 
 
-def configure_cplex_solver(timeout: int, configuration: List[str] = None):
-    solver_verbose = False
-
+def set_mip_start(
+    prev_sol: Solution,
+    coord_x: List[pulp.LpVariable],
+    coord_y: List[pulp.LpVariable],
+    rotation=None,
+):
+    # Only the values that fit inside the bounds of the new model are used,
+    # the solver completes the partial start with the remaining variables
+    for i in range(min(len(coord_x), prev_sol.n_circuits)):
+        coord_x[i].setInitialValue(prev_sol.coords["x"][i], check=False)
+        coord_y[i].setInitialValue(prev_sol.coords["y"][i], check=False)
+        if rotation is not None and prev_sol.rotation is not None and isinstance(rotation[i], pulp.LpVariable):
+            rotation[i].setInitialValue(int(prev_sol.rotation[i]), check=False)
+
+
+def configure_cplex_solver(
+    timeout: int,
+    configuration: List[str] = None,
+    warm_start: bool = False,
+    solver_verbose: bool = False,
+):
     # https://www.ibm.com/docs/en/icos/22.1.0?topic=cplex-list-parameters
     if configuration is not None:
         # default to True
@@ -72,19 +96,19 @@ def configure_cplex_solver(timeout: int, configuration: List[str] = None):
         print(f"warmStart: {warmStart} - {options}")
     else:
         # options = []
+        warmStart = False
         options = ["set preprocessing symmetry 5", "set output clonelog -1"]
 
     return pulp.CPLEX_CMD(
         mip=True,
         msg=solver_verbose,
         timeLimit=timeout,
-        options=options
+        options=options,
+        warmStart=warmStart or warm_start,
     )
 
 
-def configure_mosek_solver(timeout: int):
-    solver_verbose = False
-
+def configure_mosek_solver(timeout: int, solver_verbose: bool = False):
     # https://docs.mosek.com/latest/opt-server/param-groups.html
     options = {
         mosek.dparam.mio_max_time: timeout
@@ -31,7 +31,7 @@ def plot(width, height, n, circuits, coords, path, cmap_name="Set3"):
 
 
 def plot_cmap(
-    width, height, n, circuits, coords, path, rotation=None, cmap_name="Set3"
+    width, height, n, widths, heights, coords, path, rotation=None, cmap_name="Set3"
 ):
     fig = plt.figure(figsize=(width, width))
     ax = fig.add_subplot(111, aspect="equal")
@@ -45,8 +45,8 @@ def plot_cmap(
         else rotation
     )
     for i in range(0, n):
-        circ_width = int(circuits[i][0]) if rotation[i] == 0 else int(circuits[i][1])
-        circ_height = int(circuits[i][1]) if rotation[i] == 0 else int(circuits[i][0])
+        circ_width = int(widths[i]) if rotation[i] == 0 else int(heights[i])
+        circ_height = int(heights[i]) if rotation[i] == 0 else int(widths[i])
         coord_x = int(coords["x"][i])
         coord_y = int(coords["y"][i])
         patches.append(
@@ -74,7 +74,8 @@ def plot_solution(sol: Solution, plot_file: str):
             sol.width,
             sol.height,
             sol.n_circuits,
-            sol.circuits,
+            sol.widths,
+            sol.heights,
             sol.coords,
             plot_file,
             sol.rotation,
@@ -1,17 +1,23 @@
 import argparse
-import time, math, warnings
-from os.path import exists, join, splitext
+import os, time, math, warnings
+from collections import defaultdict
+from io import StringIO
+from itertools import combinations
+from os.path import join, splitext
 
 import sys 
 sys.path.append('./')
 
+import numpy as np
+
 from utils.types import ModelType, SolverSMT, Solution, StatusEnum, RunType, InputMode
 from utils.plot import plot_cmap
 from utils.solution_log import save_solution
 from utils.manage_statistics import save_statistics
 from utils.manage_paths import format_plot_file, format_data_file
 
-from pysmt.shortcuts import LT, Int, Solver, Equals
+from pysmt.shortcuts import LE, Int, Solver, Equals, Implies, Symbol
+from pysmt.typing import INT
 from pysmt.exceptions import SolverReturnedUnknownResultError
 from pysmt.smtlib.parser import SmtLib20Parser
 
@@ -51,21 +57,6 @@ def parse_solution(data, model_type):
     return l, coord_x, coord_y, rotation
 
 
-# It returns widths and heights from the txt instance 
-def get_w_and_h_from_txt(file_name):
-    complete_path = format_data_file(file_name[:-4], input_mode)
-    if exists(complete_path):
-        circuits = []
-        with open(complete_path) as fin:
-            for i, data in enumerate(fin.readlines()):
-                if i != 0 and i != 1:
-                    data = data.split(" ")
-                    circuits.append((data[0], data[1].rstrip()))
-        return circuits
-    else:
-        print("ERROR: the instance path doesn't exists.")
-
-
 # Check if the file with the weights exists and if it has the correct extension
 def check_file(parser, instance):
     ext = splitext(instance)[-1].lower()
@@ -96,17 +87,47 @@ def check_smt_parameters():
     mode.add_argument('-test', '--test-smt', dest='test', help='Specify the interval of instances to run the solver on.', 
                     nargs=2, type=int)
     p.add_argument('-search', '--search-method', dest='search', help='Choose the search method to optimize the solution.',
-                    type=str, choices=['bin', 'lbound'], default="bin")
+                    type=str, choices=['bin', 'lbound', 'omt'], default="bin")
+    p.add_argument('-dump', '--dump-model', dest='dump_model', help='Save the generated SMT-LIB script in the src directory.',
+                    action='store_true')
     args = p.parse_args()
+    if args.search == 'omt' and args.solver_name != SolverSMT.Z3.value:
+        p.error("The omt search method is available only with the z3 solver.")
     param = dict(args._get_kwargs())
     return param
 
 
+# Height of the greedy placement that puts each circuit, from the tallest one, at the earliest
+# row where it fits on top of the ones already placed. It's an admissible upper bound for l
+def est_upper_bound(W, N, widths, heights):
+    # A circuit wider than the plate can't be placed, the circuits are just stacked
+    if any(w > W for w in widths):
+        return sum(heights)
+    skyline = [0] * W
+    for i in sorted(range(N), key=lambda i: (-heights[i], -widths[i])):
+        w = widths[i]
+        # Earliest start of the circuit and the leftmost column where it's reached
+        y, x = min((max(skyline[x:x+w]), x) for x in range(W - w + 1))
+        skyline[x:x+w] = [y + heights[i]] * w
+    return max(skyline)
+
+
+# Circuits with the same size can be swapped, so each group of them is ordered
+# lexicographically on the coordinates with a chain between consecutive circuits
+def same_size_symmetry(N, widths, heights):
+    groups = defaultdict(list)
+    for i in range(N):
+        groups[(widths[i], heights[i])].append(i)
+
+    return [f"(assert (or (< coord_x{i} coord_x{j}) (and (= coord_x{i} coord_x{j}) (<= coord_y{i} coord_y{j}))))"
+            for g in groups.values() for i, j in zip(g, g[1:])]
+
+
 # We append to the string all the script to avoid writing it manually
 def build_SMTLIB_model(W, N, widths, heights, logic="LIA"):
     # Lower and upper bounds for the height
     l_low = max(max(heights), math.ceil(sum([widths[i]*heights[i] for i in range(N)]) / W))
-    l_up = sum(heights)
+    l_up = est_upper_bound(W, N, widths, heights)
     lines = []
 
     # Options
@@ -118,43 +139,38 @@ def build_SMTLIB_model(W, N, widths, heights, logic="LIA"):
     lines.append("(declare-fun l () Int)")
 
     # Domain of variables
-    lines += [f"(assert (and (>= coord_x{i} 0) (<= coord_x{i} {W-min(widths)})))" for i in range(N)]
-    lines += [f"(assert (and (>= coord_y{i} 0) (<= coord_y{i} {l_up-min(heights)})))" for i in range(N)]
+    lines += [f"(assert (and (>= coord_x{i} 0) (<= coord_x{i} {W-widths[i]})))" for i in range(N)]
+    lines += [f"(assert (and (>= coord_y{i} 0) (<= coord_y{i} {l_up-heights[i]})))" for i in range(N)]
     lines.append(f"(assert (and (>= l {l_low}) (<= l {l_up})))")
 
+    # Right and top sides of the circuits, shared by the following constraints
+    x_right = [f"(+ coord_x{i} {widths[i]})" for i in range(N)]
+    y_top = [f"(+ coord_y{i} {heights[i]})" for i in range(N)]
 
     # Non-Overlap constraints, at least one needs to be satisfied
-    for i in range(N):
-        for j in range(N):
-            if i < j:
-                lines.append(f"(assert (or (<= (+ coord_x{i} {widths[i]}) coord_x{j}) "
-                                         f"(<= (+ coord_y{i} {heights[i]}) coord_y{j}) "
-                                         f"(>= (- coord_x{i} {widths[j]}) coord_x{j}) "
-                                         f"(>= (- coord_y{i} {heights[j]}) coord_y{j})))"
-                )
+    lines.extend(f"(assert (or (<= {x_right[i]} coord_x{j}) (<= {y_top[i]} coord_y{j}) "
+                             f"(<= {x_right[j]} coord_x{i}) (<= {y_top[j]} coord_y{i})))"
+                 for i, j in combinations(range(N), 2))
 
     # Boundary constraints
-    lines += [f"(assert (and (<= (+ coord_x{i} {widths[i]}) {W}) (<= (+ coord_y{i} {heights[i]}) l)))" for i in range(N)]
+    lines += [f"(assert (and (<= {x_right[i]} {W}) (<= {y_top[i]} l)))" for i in range(N)]
     
-    # Cumulative constraints 
-    for w in widths:
-        sum_var = [f"(ite (and (<= coord_y{i} {w}) (< {w} (+ coord_y{i} {heights[i]}))) {widths[i]} 0)" for i in range(N)]
+    # Cumulative constraints, checked on every column of the plate and only on the rows below the
+    # lower bound of l to keep the number of assertions bounded. They are implied by the non-overlap,
+    # so checking a subset of the rows is still sound
+    for t in range(l_low):
+        sum_var = [f"(ite (and (<= coord_y{i} {t}) (< {t} {y_top[i]})) {widths[i]} 0)" for i in range(N)]
         lines.append(f"(assert (<= (+ {' '.join(sum_var)}) {W}))")
 
-    for h in heights:
-        sum_var = [f"(ite (and (<= coord_x{i} {h}) (< {h} (+ coord_x{i} {widths[i]}))) {heights[i]} 0)" for i in range(N)]
+    for t in range(W):
+        sum_var = [f"(ite (and (<= coord_x{i} {t}) (< {t} {x_right[i]})) {heights[i]} 0)" for i in range(N)]
         lines.append(f"(assert (<= (+ {' '.join(sum_var)}) l))")
 
     # Symmetry breaking same size 
-    for i in range(N):
-        for j in range(N):
-            if i < j:
-                lines.append(f"(assert (ite (and (= {widths[i]} {widths[j]}) (= {heights[i]} {heights[j]}))"
-                                        f" (and (<= coord_x{i} coord_x{j}) (<= coord_y{i} coord_y{j})) true))")    
+    lines += same_size_symmetry(N, widths, heights)
 
     # Symmetry breaking that inserts the circuit with the maximum area in (0, 0)
-    areas = [widths[i]*heights[i] for i in range(N)]
-    max_area_ind = areas.index(max(areas))
+    max_area_ind = max(range(N), key=lambda i: widths[i]*heights[i])
     lines.append(f"(assert (= coord_x{max_area_ind} 0))")
     lines.append(f"(assert (= coord_y{max_area_ind} 0))")
 
@@ -163,19 +179,18 @@ def build_SMTLIB_model(W, N, widths, heights, logic="LIA"):
         lines.append(f"(get-value (coord_x{i}))")
         lines.append(f"(get-value (coord_y{i}))")
     lines.append("(get-value (l))")
-    
-    with open(f"./{run_type.value}/src/model.smt2", "w+") as f:
-        for line in lines:
-            f.write(line + '\n')
 
-    return l_low, l_up
+    return lines, l_low, l_up
 
 
 # We append to the string all the script to avoid writing it manually
 def build_SMTLIB_model_rot(W, N, widths, heights, logic="LIA"):
     # Lower and upper bounds for the height
     l_low = max(max(heights), math.ceil(sum([widths[i]*heights[i] for i in range(N)]) / W))
-    l_up = sum([max(heights[i], widths[i]) for i in range(N)])
+    # The greedy placement is admissible for this model once the circuits wider than the plate are rotated
+    wide = [widths[i] > W for i in range(N)]
+    l_up = est_upper_bound(W, N, [heights[i] if wide[i] else widths[i] for i in range(N)],
+                           [widths[i] if wide[i] else heights[i] for i in range(N)])
     lines = []
 
     # Options
@@ -185,56 +200,51 @@ def build_SMTLIB_model_rot(W, N, widths, heights, logic="LIA"):
     lines += [f"(declare-fun coord_x{i} () Int)" for i in range(N)]
     lines += [f"(declare-fun coord_y{i} () Int)" for i in range(N)]
     lines += [f"(declare-fun rot{i} () Bool)" for i in range(N)]
-    lines += [f"(declare-fun w_real{i} () Int)" for i in range(N)]
-    lines += [f"(declare-fun h_real{i} () Int)" for i in range(N)]
+    # The real dimensions are terms of the rotation instead of additional variables
+    lines += [f"(define-fun w_real{i} () Int (ite rot{i} {heights[i]} {widths[i]}))" for i in range(N)]
+    lines += [f"(define-fun h_real{i} () Int (ite rot{i} {widths[i]} {heights[i]}))" for i in range(N)]
 
     lines.append("(declare-fun l () Int)")
 
     # Domain of variables
-    coord_up = min(widths + heights)
-    lines += [f"(assert (and (>= coord_x{i} 0) (<= coord_x{i} {W-coord_up})))" for i in range(N)]
-    lines += [f"(assert (and (>= coord_y{i} 0) (<= coord_y{i} {l_up-coord_up})))" for i in range(N)]
-    lines += [f"(assert (ite rot{i} (= w_real{i} {heights[i]}) (= w_real{i} {widths[i]})))" for i in range(N)]
-    lines += [f"(assert (ite rot{i} (= h_real{i} {widths[i]}) (= h_real{i} {heights[i]})))" for i in range(N)]
+    coord_up = [min(widths[i], heights[i]) for i in range(N)]
+    lines += [f"(assert (and (>= coord_x{i} 0) (<= coord_x{i} {W-coord_up[i]})))" for i in range(N)]
+    lines += [f"(assert (and (>= coord_y{i} 0) (<= coord_y{i} {l_up-coord_up[i]})))" for i in range(N)]
 
     lines.append(f"(assert (and (>= l {l_low}) (<= l {l_up})))")
 
+    # Right and top sides of the circuits, shared by the following constraints
+    x_right = [f"(+ coord_x{i} w_real{i})" for i in range(N)]
+    y_top = [f"(+ coord_y{i} h_real{i})" for i in range(N)]
+
     # Boundary constraints
-    lines += [f"(assert (and (<= (+ coord_x{i} w_real{i}) {W}) (<= (+ coord_y{i} h_real{i}) l)))" for i in range(N)]
+    lines += [f"(assert (and (<= {x_right[i]} {W}) (<= {y_top[i]} l)))" for i in range(N)]
 
     # Non-Overlap constraints, at least one needs to be satisfied
-    for i in range(N):
-        for j in range(N):
-            if i < j:
-                lines.append(f"(assert (or (<= (+ coord_x{i} w_real{i}) coord_x{j}) "
-                                         f"(<= (+ coord_y{i} h_real{i}) coord_y{j}) "
-                                         f"(>= (- coord_x{i} w_real{j}) coord_x{j}) "
-                                         f"(>= (- coord_y{i} h_real{j}) coord_y{j})))"
-                )
-
-    # Cumulative constraints 
-    for w in widths:
-        sum_var = [f"(ite (and (<= coord_y{i} {w}) (< {w} (+ coord_y{i} h_real{i}))) w_real{i} 0)" for i in range(N)]
+    lines.extend(f"(assert (or (<= {x_right[i]} coord_x{j}) (<= {y_top[i]} coord_y{j}) "
+                             f"(<= {x_right[j]} coord_x{i}) (<= {y_top[j]} coord_y{i})))"
+                 for i, j in combinations(range(N), 2))
+
+    # Cumulative constraints, checked on every column of the plate and only on the rows below the
+    # lower bound of l to keep the number of assertions bounded. They are implied by the non-overlap,
+    # so checking a subset of the rows is still sound
+    for t in range(l_low):
+        sum_var = [f"(ite (and (<= coord_y{i} {t}) (< {t} {y_top[i]})) w_real{i} 0)" for i in range(N)]
         lines.append(f"(assert (<= (+ {' '.join(sum_var)}) {W}))")
 
-    for h in heights:
-        sum_var = [f"(ite (and (<= coord_x{i} {h}) (< {h} (+ coord_x{i} w_real{i}))) h_real{i} 0)" for i in range(N)]
+    for t in range(W):
+        sum_var = [f"(ite (and (<= coord_x{i} {t}) (< {t} {x_right[i]})) h_real{i} 0)" for i in range(N)]
         lines.append(f"(assert (<= (+ {' '.join(sum_var)}) l))")
     
     # Symmetry breaking same size 
-    for i in range(N):
-        for j in range(N):
-            if i < j:
-                lines.append(f"(assert (ite (and (= {widths[i]} {widths[j]}) (= {heights[i]} {heights[j]}))"
-                                        f" (and (<= coord_x{i} coord_x{j}) (<= coord_y{i} coord_y{j})) true))")
+    lines += same_size_symmetry(N, widths, heights)
     
     # Symmetry breakings for rotation
     lines += [f"(assert (= rot{i} false))" for i in range(N) if widths[i] == heights[i]]
     lines += [f"(assert (= rot{i} false))" for i in range(N) if heights[i] > W]
 
     # Symmetry breaking that inserts the circuit with the maximum area in (0, 0)
-    areas = [widths[i]*heights[i] for i in range(N)]
-    max_area_ind = areas.index(max(areas))
+    max_area_ind = max(range(N), key=lambda i: widths[i]*heights[i])
     lines.append(f"(assert (= coord_x{max_area_ind} 0))")
     lines.append(f"(assert (= coord_y{max_area_ind} 0))")
 
@@ -244,53 +254,57 @@ def build_SMTLIB_model_rot(W, N, widths, heights, logic="LIA"):
         lines.append(f"(get-value (coord_y{i}))")
         lines.append(f"(get-value (rot{i}))")
     lines.append("(get-value (l))")
-    
-    with open(f"./{run_type.value}/src/model_rot.smt2", "w+") as f:
-        for line in lines:
-            f.write(line + '\n')
 
-    return l_low, l_up
+    return lines, l_low, l_up
+
+
+# Save the SMT-LIB script, useful to inspect the model or run it with an external solver
+def save_SMTLIB_model(lines, model_filename):
+    # The whole script is encoded once and written with unbuffered calls on the descriptor
+    data = memoryview(("\n".join(lines) + "\n").encode())
+    fd = os.open(f"./{run_type.value}/src/{model_filename}", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+
+# Guard literal that enables the given bound on l only when it is passed as an assumption,
+# in this way the bound is added once and the solver keeps its state between the calls
+def bound_assumption(solver, name, bound):
+    guard = Symbol(name)
+    solver.add_assertion(Implies(guard, bound))
+    return guard
 
 
 # It returns the solution found by the solver on the current formula
-def run_solver_once(solver, model_type, verbose):
+def run_solver_once(solver, model_type, verbose, assumptions=None):
     vprint = print if verbose else lambda *a, **k: None
 
-    solution = {"solution":{}, "l_var": None}
-
-    res = solver.solve()
+    res = solver.solve(assumptions)
     if res != True:
         vprint("Unsat therefore search interrupted.")
         return None
 
-    last_model = solver.get_model()
-    var_list = [v[0] for v in last_model]
-    l_ind = [str(v) for v in var_list].index('l')
-    l_var = var_list[l_ind]
-    l, coord_x, coord_y, rotation = parse_solution(last_model, model_type)
-
-    solution['solution'] = {'l': l, 'coord_x': coord_x, 'coord_y': coord_y , 'rotation': rotation}
-    solution['l_var'] = l_var
-
-    return solution
+    l, coord_x, coord_y, rotation = parse_solution(solver.get_model(), model_type)
+    return {'l': l, 'coord_x': coord_x, 'coord_y': coord_y , 'rotation': rotation}
 
 
 # Offline OMT implementation for finding the minimum value of l
 def offline_omt(solver, l_low, l_up, model_type, timeout, verbose):
     vprint = print if verbose else lambda *a, **k: None
 
+    l_var = Symbol('l', INT)
+    # The optimal l is always in the interval [low, up]
     low, up = l_low, l_up
-    l_guess = up
-    l_var_backup = None
+    assumptions = None
     opt_sol = {}
 
     start_time = time.perf_counter()
     i = 0
     # Start binary search
-    while low < up:
-        up_backup = l_guess
-        l_guess = (low + up)//2
-
+    while True:
         # Check the time only if the search is already started
         if i > 0:
             check_time = time.perf_counter()
@@ -299,34 +313,28 @@ def offline_omt(solver, l_low, l_up, model_type, timeout, verbose):
                 vprint("Timeout reached, search stopped.")
                 return opt_sol, timeout
 
-        curr_l = opt_sol['l'] if 'l' in opt_sol else l_up
         try: 
-            curr_sol = run_solver_once(solver, model_type, verbose)
+            curr_sol = run_solver_once(solver, model_type, verbose, assumptions)
         except SolverReturnedUnknownResultError:
             vprint("Timeout reached, search stopped.")
             return opt_sol, timeout
 
         if curr_sol != None:
-            if curr_sol['solution']['l'] < curr_l:
-                opt_sol = curr_sol['solution']
-            vprint(f"Found solution with l={curr_sol['solution']['l']}, low={low} - up={up}")
-            l_var = curr_sol['l_var']
-            l_var_backup = l_var
-            up = l_guess
-            # Add constraints to l
-            vprint(f"Add constraint l < {up}.")
-            if i > 0:
-                solver.pop()
-            solver.push()
-            solver.add_assertion(LT(l_var, Int(up)))
+            opt_sol = curr_sol
+            vprint(f"Found solution with l={curr_sol['l']}, low={low} - up={up}")
+            up = curr_sol['l']
+        elif i == 0:
+            break
         else:
             low = l_guess + 1
-            up = up_backup
-            # Remove the previous constraint from the stack to search for a new solution
-            solver.pop()
-            solver.push()
-            solver.add_assertion(LT(l_var_backup, Int(up)))
             vprint(f"No solutions found in the last run.")
+
+        if low >= up:
+            break
+        l_guess = (low + up)//2
+        # Add constraints to l
+        vprint(f"Add constraint l <= {l_guess}.")
+        assumptions = [bound_assumption(solver, f"l_le_{l_guess}", LE(l_var, Int(l_guess)))]
         i += 1
     end_time = time.perf_counter()
 
@@ -334,36 +342,89 @@ def offline_omt(solver, l_low, l_up, model_type, timeout, verbose):
 
 
 # Apply a search starting from the minimum value of the l
-def low_bound_search(solver, parser, l_low, model_type, model_filename, timeout, verbose):
-    symb = list(parser.get_script_fname(model_filename).get_declared_symbols())
-    ind_l = [str(m) for m in symb].index('l')
-    l_var = symb[ind_l]
+def low_bound_search(solver, l_low, l_up, model_type, timeout, verbose):
+    l_var = Symbol('l', INT)
     l_guess = l_low
     solution = {}
 
-    solver.push()
-    solver.add_assertion(Equals(l_var, Int(l_guess)))
     start_time = time.perf_counter()
-    try: 
-        while not solver.solve():
-            l_guess = l_low  + 1
-            solver.pop()
-            solver.push()
-            solver.add_assertion(Equals(l_var, Int(l_guess)))
+    # The optimal l is always in the interval [l_low, l_up]
+    while l_guess <= l_up:
+        # Check the time only if the search is already started
+        if l_guess > l_low:
+            check_time = time.perf_counter()
+            remained_time = int(timeout*1000-(check_time-start_time)*1000)
+            if remained_time < 0:
+                print("Timeout reached, search stopped.")
+                return solution, timeout
             if verbose:
                 print(f"Add constraint l={l_guess}")
-        end_time = time.perf_counter()
-    except SolverReturnedUnknownResultError:
-        print("Timeout reached, search stopped.")
-        return solution, timeout
 
-    model = solver.get_model()
-    l, coord_x, coord_y, rotation = parse_solution(model, model_type)
-    solution = {'l': l, 'coord_x': coord_x, 'coord_y': coord_y, 'rotation': rotation}
+        assumptions = [bound_assumption(solver, f"l_eq_{l_guess}", Equals(l_var, Int(l_guess)))]
+        try:
+            res = solver.solve(assumptions)
+        except SolverReturnedUnknownResultError:
+            print("Timeout reached, search stopped.")
+            return solution, timeout
+
+        if res:
+            end_time = time.perf_counter()
+            model = solver.get_model()
+            l, coord_x, coord_y, rotation = parse_solution(model, model_type)
+            solution = {'l': l, 'coord_x': coord_x, 'coord_y': coord_y, 'rotation': rotation}
+            return solution, (end_time-start_time)
+        l_guess += 1
+    end_time = time.perf_counter()
+
     return solution, (end_time-start_time)
 
 
-def run_model(solver_name, instance_file, timeout, rotation, verbose, logic, search_method, stat_file):
+# Minimize l with the optimization engine of z3, a single search instead of one solve for each bound
+def z3_optimize(lines, N, model_type, timeout, verbose):
+    # z3 is installed together with its pysmt bindings
+    import z3
+    vprint = print if verbose else lambda *a, **k: None
+
+    opt = z3.Optimize()
+    opt.set(timeout=timeout*1000)
+    opt.add(z3.parse_smt2_string("\n".join(lines)))
+    l_var = z3.Int('l')
+    opt.minimize(l_var)
+
+    start_time = time.perf_counter()
+    res = opt.check()
+    end_time = time.perf_counter()
+
+    if res == z3.unsat:
+        vprint("Unsat therefore search interrupted.")
+        return {}, (end_time-start_time)
+    if res == z3.unknown:
+        vprint("Timeout reached, search stopped.")
+    try:
+        model = opt.model()
+    except z3.Z3Exception:
+        return {}, timeout
+    # After a timeout the model can be empty or partial, and then it isn't a solution
+    if res != z3.sat and not z3.is_int_value(model.eval(l_var)):
+        return {}, timeout
+
+    # A complete model can leave some variables unconstrained, a partial one can't be completed
+    coord_x = [model.eval(z3.Int(f"coord_x{i}"), model_completion=(res == z3.sat)) for i in range(N)]
+    coord_y = [model.eval(z3.Int(f"coord_y{i}"), model_completion=(res == z3.sat)) for i in range(N)]
+    if not all(z3.is_int_value(c) for c in coord_x + coord_y):
+        return {}, timeout
+    coord_x = [c.as_long() for c in coord_x]
+    coord_y = [c.as_long() for c in coord_y]
+    rotation = [z3.is_true(model.eval(z3.Bool(f"rot{i}"), model_completion=True)) for i in range(N)] \
+        if model_type == ModelType.ROTATION.value else None
+    l = model.eval(l_var).as_long()
+    vprint(f"Found solution with l={l}")
+
+    solution = {'l': l, 'coord_x': coord_x, 'coord_y': coord_y, 'rotation': rotation}
+    return solution, (end_time-start_time) if res == z3.sat else timeout
+
+
+def run_model(solver_name, instance_file, timeout, rotation, verbose, logic, search_method, stat_file, dump_model=False):
     W, N, widths, heights = extract_input_from_txt(instance_file)
 
     vprint = print if verbose else lambda *a, **k: None
@@ -372,38 +433,45 @@ def run_model(solver_name, instance_file, timeout, rotation, verbose, logic, sea
         model_type = ModelType.ROTATION
         model_filename = "model_rot.smt2"
         vprint("Generating the rotation model\n")
-        l_low, l_up = build_SMTLIB_model_rot(W, N, widths, heights, logic=logic)
+        lines, l_low, l_up = build_SMTLIB_model_rot(W, N, widths, heights, logic=logic)
     else:
         model_type = ModelType.BASE
         model_filename = "model.smt2"
         vprint("Generating the base model\n")
-        l_low, l_up = build_SMTLIB_model(W, N, widths, heights, logic=logic)
+        lines, l_low, l_up = build_SMTLIB_model(W, N, widths, heights, logic=logic)
+
+    if dump_model:
+        save_SMTLIB_model(lines, model_filename)
 
     plot_file = format_plot_file(run_type, instance_file, model_type)
     # Set some solution object variables
     solution_obj = Solution()
     solution_obj.input_name=instance_file[:-4]
     solution_obj.width=W
-    solution_obj.n_circuits=N,
-    solution_obj.circuits=[[widths[i], heights[i]] for i in range(N)]
+    solution_obj.n_circuits=N
+    solution_obj.widths=np.asarray(widths, dtype=np.int32)
+    solution_obj.heights=np.asarray(heights, dtype=np.int32)
     solution_obj.configuration = None
 
-    if solver_name == SolverSMT.CVC4.value:
-        solver_options = {'tlimit': timeout*1000} 
-    else:
-        solver_options = {'timeout': timeout*1000, 'auto_config': True} 
-        warnings.filterwarnings("ignore")
-        
-    solver = Solver(name=solver_name, solver_options=solver_options)
-    parser = SmtLib20Parser()
-    complete_path_model = f'./SMT/src/{model_filename}'
-    formula = parser.get_script_fname(complete_path_model).get_strict_formula()
-
-    solver.add_assertion(formula)
-    if search_method == "lbound":
-        solution = low_bound_search(solver, parser, l_low, model_type.value, complete_path_model, timeout, verbose)
+    if search_method == "omt":
+        solution = z3_optimize(lines, N, model_type.value, timeout, verbose)
     else:
-        solution = offline_omt(solver, l_low, l_up, model_type.value, timeout, verbose)
+        if solver_name == SolverSMT.CVC4.value:
+            solver_options = {'tlimit': timeout*1000} 
+        else:
+            solver_options = {'timeout': timeout*1000, 'auto_config': True} 
+            warnings.filterwarnings("ignore")
+            
+        solver = Solver(name=solver_name, solver_options=solver_options)
+        # The script is parsed from memory, without writing it on disk
+        parser = SmtLib20Parser()
+        formula = parser.get_script(StringIO("\n".join(lines))).get_strict_formula()
+
+        solver.add_assertion(formula)
+        if search_method == "lbound":
+            solution = low_bound_search(solver, l_low, l_up, model_type.value, timeout, verbose)
+        else:
+            solution = offline_omt(solver, l_low, l_up, model_type.value, timeout, verbose)
 
     if len(solution[0].keys()) != 0:
         l, coord_x, coord_y, rotation = solution[0]['l'], solution[0]['coord_x'], solution[0]['coord_y'],  solution[0]['rotation']
@@ -413,7 +481,7 @@ def run_model(solver_name, instance_file, timeout, rotation, verbose, logic, sea
         solution_obj.solve_time = solution[1]
         solution_obj.status = StatusEnum.FEASIBLE
         plot_cmap(
-            W, l, N, get_w_and_h_from_txt(instance_file), {'x': coord_x, 'y': coord_y},
+            W, l, N, solution_obj.widths, solution_obj.heights, {'x': coord_x, 'y': coord_y},
                 plot_file, rotation=rotation, cmap_name="turbo_r"
         )
         save_solution(f"./{run_type.value}", model_type.value, instance_file, (W, N, l, widths, heights, coord_x, coord_y))
@@ -1,3 +1,7 @@
+import sys
+
+import numpy as np
+
 from utils.types import SOLUTION_ADMISSABLE, Solution, StatusEnum
 
 FEASIBLE_MSG = "A solution has been found, but not an optimal one"
@@ -6,21 +10,19 @@ NO_SOLUTION_MSG = "No solution has been found"
 GENERIC_MSG = "Infeasible solution"
 ERROR_MSG = "Error during execution"
 
+MSG_TABLE = {
+    StatusEnum.FEASIBLE: FEASIBLE_MSG,
+    StatusEnum.OPTIMAL: OPTIMAL_MSG,
+    StatusEnum.NO_SOLUTION_FOUND: NO_SOLUTION_MSG,
+    StatusEnum.ERROR: ERROR_MSG,
+}
+
 out_path = "{root}/out/{model}/{file}"
 
 def print_logging(solution: Solution, verbose: bool):
     vprint = print if verbose else lambda *a, **k: None
 
-    if solution.status == StatusEnum.FEASIBLE:
-        vprint(FEASIBLE_MSG)
-    elif solution.status == StatusEnum.OPTIMAL:
-        vprint(OPTIMAL_MSG)
-    elif solution.status == StatusEnum.NO_SOLUTION_FOUND:
-        vprint(NO_SOLUTION_MSG)
-    elif solution.status == StatusEnum.ERROR:
-        vprint(ERROR_MSG)
-    else:
-        vprint(GENERIC_MSG)
+    vprint(MSG_TABLE.get(solution.status, GENERIC_MSG))
 
     if SOLUTION_ADMISSABLE(solution.status):
         # Printing logging
@@ -29,13 +31,17 @@ def print_logging(solution: Solution, verbose: bool):
         )
         vprint(f"Time: {solution.solve_time}")
 
-        for i in range(0, solution.n_circuits):
-            vprint(
-                (
-                    f"{solution.circuits[i][1] if solution.rotation and solution.rotation[i] else solution.circuits[i][0]} {solution.circuits[i][0] if solution.rotation and solution.rotation[i] else solution.circuits[i][1]}, "
-                    f"{solution.coords['x'][i]} {solution.coords['y'][i]}"
-                )
-            )
+        if verbose:
+            # The circuits are printed all at once with their placed dimensions
+            rot = solution.rotation or [False] * solution.n_circuits
+            cx, cy = solution.coords["x"], solution.coords["y"]
+            w = np.where(rot, solution.heights, solution.widths)
+            h = np.where(rot, solution.widths, solution.heights)
+            lines = [
+                f"{w[i]} {h[i]}, {cx[i]} {cy[i]}"
+                for i in range(solution.n_circuits)
+            ]
+            sys.stdout.write("\n".join(lines) + "\n")
 
 
 def save_solution(root, model, file_name, data):
@@ -46,7 +52,6 @@ def save_solution(root, model, file_name, data):
     if len(cx) != N or len(cy) != N:
         cx = [-1 for i in range(N)]
         cy = [-1 for i in range(N)]
-    lines = [f"{widths[i]} {heights[i]} {cx[i]} {cy[i]}\n" for i in range(N)]
+    body = "\n".join(f"{widths[i]} {heights[i]} {cx[i]} {cy[i]}" for i in range(N))
     with open(out_file, "w+") as fout:
-        fout.writelines([f"{W} {l}\n", f"{N}\n"])
-        fout.writelines(lines)
+        fout.write(f"{W} {l}\n{N}\n{body}\n")
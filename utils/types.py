@@ -1,6 +1,8 @@
 from enum import Enum
 from typing import TypedDict, List
 
+import numpy as np
+
 DEFAULT_TIMEOUT = 300
 
 class RunType(Enum):
@@ -64,7 +66,8 @@ class Solution:
     input_name: str
     width: int
     n_circuits: int
-    circuits: List[List[int]]
+    widths: np.ndarray
+    heights: np.ndarray
     height: int
     solve_time: float
     rotation: List[bool] = None